@@ -1,9 +1,14 @@
-from sqlmodel import SQLModel, Field
-from datetime import datetime, date
-from typing import Optional
+from sqlmodel import SQLModel, Field, Index, text
+from datetime import datetime, date, timezone
+from typing import NamedTuple, Optional
 from enum import Enum
 
 
+def utc_now() -> datetime:
+    """Current UTC time as a naive datetime, matching the timezone-less timestamp columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class TaskPriority(str, Enum):
     """Task priority levels."""
 
@@ -17,6 +22,25 @@ class Task(SQLModel, table=True):
     """Task model for the todo list application."""
 
     __tablename__ = "tasks"  # type: ignore[assignment]
+    __table_args__ = (
+        # Partial indexes serve the pending/completed listings as ordered index scans. The pending index only
+        # holds the active working set, so it stays small no matter how many completed tasks pile up.
+        # Both end with id to match the listings' tiebreaker, so no sort step is needed for equal timestamps.
+        Index(
+            "ix_tasks_pending",
+            "created_at",
+            "id",
+            postgresql_where=text("completed IS false"),
+            sqlite_where=text("completed IS 0"),
+        ),
+        Index(
+            "ix_tasks_completed",
+            "updated_at",
+            "id",
+            postgresql_where=text("completed IS true"),
+            sqlite_where=text("completed IS 1"),
+        ),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(max_length=200, min_length=1)
@@ -24,8 +48,8 @@ class Task(SQLModel, table=True):
     completed: bool = Field(default=False)
     priority: TaskPriority = Field(default=TaskPriority.MEDIUM)
     due_date: Optional[date] = Field(default=None)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
 
 # Non-persistent schemas for validation and API operations
@@ -48,6 +72,19 @@ class TaskUpdate(SQLModel, table=False):
     due_date: Optional[date] = Field(default=None)
 
 
+class TaskRow(NamedTuple):
+    """Read-only task row for listings, loaded without ORM instance tracking."""
+
+    id: int
+    title: str
+    description: str
+    completed: bool
+    priority: TaskPriority
+    due_date: Optional[date]
+    created_at: datetime
+    updated_at: datetime
+
+
 class TaskResponse(SQLModel, table=False):
     """Schema for task responses."""
 
@@ -1,10 +1,61 @@
 """Task service layer for managing CRUD operations."""
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
-from sqlmodel import Session, select, desc
+from sqlalchemy.orm import raiseload
+from sqlmodel import Date, Session, bindparam, case, col, func, not_, select, desc, update
 from app.database import get_session
-from app.models import Task, TaskCreate, TaskUpdate
+from app.models import Task, TaskCreate, TaskPriority, TaskRow, TaskUpdate, utc_now
+
+DUE_BUCKETS: tuple[str, ...] = ("overdue", "today", "future")
+
+# Read statements are built once at import and reused by every call. List queries that load Task entities use
+# raiseload("*") so any relationship touched while rendering a list fails fast instead of issuing one query per row;
+# load relationships a listing really needs explicitly (e.g. selectinload). The column-only listing can't lazy-load.
+_ALL_TASKS_STMT = select(*(getattr(Task, field) for field in TaskRow._fields)).order_by(
+    col(Task.completed).asc(), desc(Task.created_at), desc(Task.id)
+)
+_COMPLETED_TASKS_STMT = (
+    select(Task)
+    .where(col(Task.completed).is_(True))
+    .order_by(desc(Task.updated_at), desc(Task.id))
+    .options(raiseload("*"))
+)
+_PENDING_TASKS_STMT = (
+    select(Task)
+    .where(col(Task.completed).is_(False))
+    .order_by(desc(Task.created_at), desc(Task.id))
+    .options(raiseload("*"))
+)
+_TASKS_BY_ID_STMT = (
+    select(Task)
+    .where(col(Task.id).in_(bindparam("task_ids", expanding=True)))
+    .order_by(col(Task.id))
+    .options(raiseload("*"))
+)
+
+_today = bindparam("today", type_=Date)
+_due_bucket = case(
+    (col(Task.due_date) < _today, "overdue"),
+    (col(Task.due_date) == _today, "today"),
+    else_="future",
+)
+_DUE_DATE_SUMMARY_STMT = (
+    select(Task.priority, _due_bucket, func.count())
+    .where(col(Task.completed).is_(False), col(Task.due_date).is_not(None))
+    .group_by(Task.priority, _due_bucket)
+)
+
+
+def _new_task(task_data: TaskCreate, now: datetime) -> Task:
+    return Task(
+        title=task_data.title,
+        description=task_data.description,
+        priority=task_data.priority,
+        due_date=task_data.due_date,
+        created_at=now,
+        updated_at=now,
+    )
 
 
 class TaskService:
@@ -14,52 +65,69 @@ class TaskService:
         """Initialize with optional session for testing."""
         self.session = session or get_session()
 
-    def create_task(self, task_data: TaskCreate) -> Task:
-        """Create a new task."""
-        task = Task(**task_data.model_dump())
+    def create_task(self, task_data: TaskCreate, now: Optional[datetime] = None) -> Task:
+        """Create a new task. Pass ``now`` to share one timestamp across a batch of writes."""
+        task = _new_task(task_data, now or utc_now())
         self.session.add(task)
         self.session.commit()
-        self.session.refresh(task)
         return task
 
-    def get_all_tasks(self) -> list[Task]:
-        """Get all tasks ordered by created date (newest first)."""
-        statement = select(Task).order_by(desc(Task.created_at))
-        tasks = self.session.exec(statement).all()
-        return list(tasks)
+    def bulk_create(self, tasks: list[TaskCreate], now: Optional[datetime] = None) -> list[Task]:
+        """Create several tasks with a single commit, all sharing one timestamp.
+
+        Listings break the timestamp tie by ID, so later tasks in the batch are listed as newer.
+        """
+        now = now or utc_now()
+        created = [_new_task(task_data, now) for task_data in tasks]
+        self.session.add_all(created)
+        self.session.commit()
+        return created
+
+    def get_all_tasks(self) -> list[TaskRow]:
+        """Get all tasks, pending before completed, each group ordered by created date (newest first, ties by ID).
+
+        Rows are selected column-wise into plain tuples, skipping ORM instance hydration for the full listing.
+        """
+        return [TaskRow._make(row) for row in self.session.exec(_ALL_TASKS_STMT)]
 
     def get_task(self, task_id: int) -> Optional[Task]:
         """Get a specific task by ID."""
         return self.session.get(Task, task_id)
 
-    def update_task(self, task_id: int, task_data: TaskUpdate) -> Optional[Task]:
-        """Update an existing task."""
+    def get_many(self, task_ids: list[int]) -> list[Task]:
+        """Get the tasks with the given IDs in one query, ordered by ID. Unknown IDs are skipped."""
+        tasks = self.session.exec(_TASKS_BY_ID_STMT, params={"task_ids": task_ids}).all()
+        return list(tasks)
+
+    def update_task(self, task_id: int, task_data: TaskUpdate, now: Optional[datetime] = None) -> Optional[Task]:
+        """Update an existing task. Pass ``now`` to share one timestamp across a batch of writes."""
         task = self.session.get(Task, task_id)
         if task is None:
             return None
 
         # Update only provided fields
-        update_data = task_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(task, field, value)
+        for field in task_data.model_fields_set:
+            setattr(task, field, getattr(task_data, field))
 
-        task.updated_at = datetime.utcnow()
+        task.updated_at = now or utc_now()
         self.session.add(task)
         self.session.commit()
-        self.session.refresh(task)
         return task
 
-    def toggle_completed(self, task_id: int) -> Optional[Task]:
-        """Toggle task completion status."""
-        task = self.session.get(Task, task_id)
-        if task is None:
-            return None
-
-        task.completed = not task.completed
-        task.updated_at = datetime.utcnow()
-        self.session.add(task)
+    def toggle_completed(self, task_id: int, now: Optional[datetime] = None) -> Optional[Task]:
+        """Toggle task completion status. Pass ``now`` to share one timestamp across a batch of writes.
+
+        Flips the flag with a single ``UPDATE ... RETURNING`` instead of loading the task first.
+        """
+        statement = (
+            update(Task)
+            .where(col(Task.id) == task_id)
+            .values(completed=not_(col(Task.completed)), updated_at=now or utc_now())
+            .returning(Task)
+            .execution_options(populate_existing=True)
+        )
+        task = self.session.scalars(statement).one_or_none()
         self.session.commit()
-        self.session.refresh(task)
         return task
 
     def delete_task(self, task_id: int) -> bool:
@@ -74,16 +142,25 @@ class TaskService:
 
     def get_completed_tasks(self) -> list[Task]:
         """Get all completed tasks."""
-        statement = select(Task).where(Task.completed).order_by(desc(Task.updated_at))
-        tasks = self.session.exec(statement).all()
+        tasks = self.session.exec(_COMPLETED_TASKS_STMT).all()
         return list(tasks)
 
     def get_pending_tasks(self) -> list[Task]:
         """Get all pending (non-completed) tasks."""
-        statement = select(Task).where(Task.completed == False).order_by(desc(Task.created_at))  # noqa: E712
-        tasks = self.session.exec(statement).all()
+        tasks = self.session.exec(_PENDING_TASKS_STMT).all()
         return list(tasks)
 
+    def get_due_date_summary(self, today: Optional[date] = None) -> dict[TaskPriority, dict[str, int]]:
+        """Count pending tasks with a due date per priority and due bucket (overdue, today, future)."""
+        params = {"today": today or date.today()}
+
+        summary: dict[TaskPriority, dict[str, int]] = {
+            priority: {bucket: 0 for bucket in DUE_BUCKETS} for priority in TaskPriority
+        }
+        for priority, due_bucket, count in self.session.exec(_DUE_DATE_SUMMARY_STMT, params=params):
+            summary[TaskPriority(priority)][due_bucket] = count
+        return summary
+
     def close(self) -> None:
         """Close the database session."""
         if self.session:
@@ -1,9 +1,65 @@
 """Todo list UI components and functionality."""
 
+from contextlib import contextmanager
 from datetime import date
-from nicegui import ui
+from html import escape
+from itertools import islice
+from logging import getLogger
+from typing import Callable, Iterator, Optional
+from nicegui import app, ui
+from nicegui.events import GenericEventArguments, ValueChangeEventArguments
 from app.task_service import TaskService
-from app.models import TaskCreate, TaskUpdate, TaskPriority
+from app.models import TaskCreate, TaskPriority, TaskRow, TaskUpdate
+
+logger = getLogger(__name__)
+
+# Task cards mounted per batch; longer lists mount further batches as they are scrolled
+TASK_BATCH_SIZE = 20
+
+# Seconds a completion checkbox must be left alone before its state is saved
+TOGGLE_DEBOUNCE = 0.15
+
+# Priority styling, built once instead of per rendered card
+PRIORITY_COLORS = {
+    TaskPriority.LOW: "bg-green-100 text-green-800",
+    TaskPriority.MEDIUM: "bg-blue-100 text-blue-800",
+    TaskPriority.HIGH: "bg-orange-100 text-orange-800",
+    TaskPriority.URGENT: "bg-red-100 text-red-800",
+}
+PRIORITY_ICONS = {
+    TaskPriority.LOW: "🟢",
+    TaskPriority.MEDIUM: "🟡",
+    TaskPriority.HIGH: "🟠",
+    TaskPriority.URGENT: "🔴",
+}
+PRIORITY_BADGE_LABELS = {p: f"{PRIORITY_ICONS[p]} {p.value.title()}" for p in TaskPriority}
+PRIORITY_BADGE_CLASSES = {p: f"text-xs px-2 py-1 rounded-full {PRIORITY_COLORS[p]}" for p in TaskPriority}
+PRIORITY_OPTIONS = {p: f"{p.value.title()} {PRIORITY_ICONS[p]}" for p in TaskPriority}
+
+# Card class strings for every styling combination, looked up per card instead of concatenated
+CARD_CLASSES = {
+    (priority, completed): f"w-full p-4 task-card priority-{priority.value} "
+    + ("completed-task bg-gray-50" if completed else "bg-white shadow-md hover:shadow-lg")
+    for priority in TaskPriority
+    for completed in (True, False)
+}
+# Title and description classes are keyed by completed, due date classes by overdue
+TITLE_CLASSES = {True: "text-lg font-medium line-through text-gray-500", False: "text-lg font-medium text-gray-800"}
+DESCRIPTION_CLASSES = {True: "text-sm text-gray-600 line-through", False: "text-sm text-gray-600"}
+DUE_DATE_CLASSES = {
+    True: "text-xs px-2 py-1 rounded-full bg-red-100 text-red-800",
+    False: "text-xs px-2 py-1 rounded-full bg-gray-100 text-gray-700",
+}
+
+# Read-only part of a task card (title, description, badges), rendered as one HTML element instead of a widget each
+TASK_CONTENT_TEMPLATE = (
+    '<div class="{title_classes}">{title}</div>'
+    "{description}"
+    '<div class="flex gap-4 mt-2">'
+    '<span class="{badge_classes}">{badge_label}</span>'
+    "{due_date}"
+    "</div>"
+)
 
 
 def create():
@@ -31,14 +87,21 @@ def create():
 
         # Main container
         with ui.column().classes("max-w-4xl mx-auto p-4 gap-6"):
-            # Task creation form
-            create_task_form()
+            # Task list is re-rendered in place after every mutation instead of reloading the page.
+            # One refreshable per page keeps refreshes scoped to this client.
+            task_list = ui.refreshable(refresh_task_list)
+
+            def on_change() -> None:
+                # Save checkbox clicks still waiting out their debounce first, so the re-render shows them
+                save_pending_toggles()
+                task_list.refresh()
 
-            # Task list container
-            task_list_container = ui.column().classes("w-full")
+            # Task creation form
+            create_task_form(on_change)
 
             # Load and display tasks
-            refresh_task_list(task_list_container)
+            with ui.column().classes("w-full"):
+                task_list(on_change)
 
         # Add custom styles for better aesthetics
         ui.add_head_html("""
@@ -61,7 +124,24 @@ def create():
         """)
 
 
-def create_task_form():
+@contextmanager
+def task_service() -> Iterator[TaskService]:
+    """Yield the current page's TaskService, creating it on first use.
+
+    The service lives in ``app.storage.client`` for the lifetime of the page. Its session is closed after each use,
+    which returns the connection to the pool and clears the identity map so the next action sees fresh data.
+    """
+    service = app.storage.client.get("task_service")
+    if service is None:
+        service = TaskService()
+        app.storage.client["task_service"] = service
+    try:
+        yield service
+    finally:
+        service.close()
+
+
+def create_task_form(on_change: Callable[[], None]):
     """Create the task creation form."""
 
     with ui.card().classes("w-full p-6 bg-gradient-to-r from-blue-50 to-indigo-50 border-l-4 border-blue-500"):
@@ -79,12 +159,7 @@ def create_task_form():
             priority_select = (
                 ui.select(
                     label="Priority",
-                    options={
-                        TaskPriority.LOW: "Low 🟢",
-                        TaskPriority.MEDIUM: "Medium 🟡",
-                        TaskPriority.HIGH: "High 🟠",
-                        TaskPriority.URGENT: "Urgent 🔴",
-                    },
+                    options=PRIORITY_OPTIONS,
                     value=TaskPriority.MEDIUM,
                 )
                 .classes("w-32")
@@ -98,7 +173,9 @@ def create_task_form():
             ui.button(
                 "Add Task",
                 icon="add",
-                on_click=lambda: add_new_task(title_input, priority_select, due_date_input, description_input),
+                on_click=lambda: add_new_task(
+                    title_input, priority_select, due_date_input, description_input, on_change
+                ),
             ).classes("px-6 py-3 bg-blue-600 hover:bg-blue-700 text-white font-medium")
 
         # Description input (full width)
@@ -108,15 +185,8 @@ def create_task_form():
             .props("outlined dense rows=2")
         )
 
-        # Add task button
-        ui.button(
-            "Add Task",
-            icon="add",
-            on_click=lambda: add_new_task(title_input, priority_select, due_date_input, description_input),
-        ).classes("px-6 py-3 bg-blue-600 hover:bg-blue-700 text-white font-medium")
-
 
-def add_new_task(title_input, priority_select, due_date_input, description_input):
+def add_new_task(title_input, priority_select, due_date_input, description_input, on_change: Callable[[], None]):
     """Add a new task to the database."""
 
     title = title_input.value.strip()
@@ -124,17 +194,12 @@ def add_new_task(title_input, priority_select, due_date_input, description_input
         ui.notify("Please enter a task title", type="negative")
         return
 
-    task_service = None
     try:
-        task_service = TaskService()
-
         # Parse due date
         due_date = None
         if due_date_input.value:
             if isinstance(due_date_input.value, str):
-                from datetime import datetime
-
-                due_date = datetime.fromisoformat(due_date_input.value).date()
+                due_date = date.fromisoformat(due_date_input.value[:10])
             else:
                 due_date = due_date_input.value
 
@@ -144,7 +209,8 @@ def add_new_task(title_input, priority_select, due_date_input, description_input
         # Create task
         task_data = TaskCreate(title=title, description=description, priority=priority_select.value, due_date=due_date)
 
-        task = task_service.create_task(task_data)
+        with task_service() as service:
+            task = service.create_task(task_data)
 
         # Clear form
         title_input.value = ""
@@ -154,178 +220,202 @@ def add_new_task(title_input, priority_select, due_date_input, description_input
 
         ui.notify(f'Task "{task.title}" added successfully!', type="positive")
 
-        # Refresh the page to show new task
-        ui.navigate.reload()
+        # Re-render only the task list to show the new task
+        on_change()
 
     except Exception as e:
-        import logging
-
-        logging.error(f"Error adding task: {str(e)}")
+        logger.exception("Error adding task")
         ui.notify(f"Error adding task: {str(e)}", type="negative")
-    finally:
-        if task_service:
-            task_service.close()
-
 
-def refresh_task_list(container):
-    """Refresh the task list display."""
 
-    container.clear()
+def refresh_task_list(on_change: Callable[[], None]):
+    """Render the task list; wrapped in ``ui.refreshable`` by the page so it can be re-rendered in place."""
 
-    task_service = None
     try:
-        task_service = TaskService()
-        tasks = task_service.get_all_tasks()
+        with task_service() as service:
+            tasks = service.get_all_tasks()
 
         if not tasks:
             # Empty state
-            with container:
-                with ui.card().classes("w-full p-12 text-center bg-gray-50 border-dashed border-2 border-gray-300"):
-                    ui.icon("task_alt", size="4rem").classes("text-gray-400 mb-4")
-                    ui.label("No tasks yet!").classes("text-xl text-gray-600 mb-2")
-                    ui.label("Add your first task above to get started.").classes("text-gray-500")
+            with ui.card().classes("w-full p-12 text-center bg-gray-50 border-dashed border-2 border-gray-300"):
+                ui.icon("task_alt", size="4rem").classes("text-gray-400 mb-4")
+                ui.label("No tasks yet!").classes("text-xl text-gray-600 mb-2")
+                ui.label("Add your first task above to get started.").classes("text-gray-500")
             return
 
-        # Group tasks by completion status
-        pending_tasks = [t for t in tasks if not t.completed]
-        completed_tasks = [t for t in tasks if t.completed]
+        # Group tasks by completion status in a single pass
+        pending_tasks: list[TaskRow] = []
+        completed_tasks: list[TaskRow] = []
+        for task in tasks:
+            (completed_tasks if task.completed else pending_tasks).append(task)
 
-        # Display pending tasks
-        if pending_tasks:
-            with container:
-                ui.label(f"📋 Pending Tasks ({len(pending_tasks)})").classes(
-                    "text-lg font-semibold text-gray-700 mb-3 mt-6"
-                )
-                for task in pending_tasks:
-                    create_task_card(task, container)
-
-        # Display completed tasks
-        if completed_tasks:
-            with container:
-                ui.label(f"✅ Completed Tasks ({len(completed_tasks)})").classes(
-                    "text-lg font-semibold text-gray-700 mb-3 mt-6"
-                )
-                for task in completed_tasks:
-                    create_task_card(task, container)
+        cards = render_task_sections(pending_tasks, completed_tasks, on_change)
+
+        if len(tasks) <= TASK_BATCH_SIZE:
+            app.storage.client.pop("task_list_view", None)
+            mount_cards(cards)
+            return
+
+        # Long lists: mount the first batch now and the next one whenever the user nears the end of the list.
+        # How far the list was scrolled is kept per page, so a refresh (e.g. after ticking a task far down the list)
+        # remounts the same cards and restores the scroll position instead of jumping back to the first batch.
+        view: dict[str, int] = app.storage.client.setdefault(
+            "task_list_view", {"cards": TASK_BATCH_SIZE, "position": 0}
+        )
+        with ui.scroll_area().classes("w-full h-[70vh]") as scroll_area:
+            cards_column = ui.column().classes("w-full")
+
+        def mount_batch(limit: int) -> int:
+            with cards_column:
+                return mount_cards(cards, limit)
+
+        def handle_scroll(e: GenericEventArguments) -> None:
+            view["position"] = int(e.args["verticalPosition"])
+            if e.args["verticalPercentage"] >= 0.8:
+                view["cards"] += mount_batch(TASK_BATCH_SIZE)
+
+        view["cards"] = mount_batch(view["cards"])
+        if view["position"]:
+            scroll_area.scroll_to(pixels=view["position"])
+        scroll_area.on("scroll", handle_scroll, args=["verticalPosition", "verticalPercentage"], throttle=0.05)
 
     except Exception as e:
-        import logging
+        logger.exception("Error loading tasks")
+        ui.notify(f"Error loading tasks: {str(e)}", type="negative")
+
+
+def render_task_sections(
+    pending_tasks: list[TaskRow], completed_tasks: list[TaskRow], on_change: Callable[[], None]
+) -> Iterator[None]:
+    """Render section headers and task cards lazily, yielding once after each card."""
+
+    # Display pending tasks
+    if pending_tasks:
+        ui.label(f"📋 Pending Tasks ({len(pending_tasks)})").classes("text-lg font-semibold text-gray-700 mb-3 mt-6")
+        for task in pending_tasks:
+            create_task_card(task, on_change)
+            yield
+
+    # Display completed tasks
+    if completed_tasks:
+        ui.label(f"✅ Completed Tasks ({len(completed_tasks)})").classes(
+            "text-lg font-semibold text-gray-700 mb-3 mt-6"
+        )
+        for task in completed_tasks:
+            create_task_card(task, on_change)
+            yield
 
-        logging.error(f"Error loading tasks: {str(e)}")
-        with container:
-            ui.notify(f"Error loading tasks: {str(e)}", type="negative")
-    finally:
-        if task_service:
-            task_service.close()
 
+def mount_cards(cards: Iterator[None], limit: Optional[int] = None) -> int:
+    """Mount up to ``limit`` cards from ``render_task_sections`` into the current container (all if None).
 
-def create_task_card(task, container):
-    """Create a task card UI component."""
+    Returns the number of cards mounted.
+    """
+    return sum(1 for _ in islice(cards, limit))
 
-    # Determine priority styling
-    priority_class = f"priority-{task.priority.value}"
-    card_classes = f"w-full p-4 task-card {priority_class}"
-    if task.completed:
-        card_classes += " completed-task bg-gray-50"
-    else:
-        card_classes += " bg-white shadow-md hover:shadow-lg"
-
-    with container:
-        with ui.card().classes(card_classes):
-            with ui.row().classes("w-full items-start justify-between"):
-                # Left side: checkbox and task info
-                with ui.row().classes("flex-1 items-start gap-3"):
-                    # Completion checkbox
-                    ui.checkbox(
-                        value=task.completed, on_change=lambda e, task_id=task.id: toggle_task_completion(task_id)
-                    ).classes("mt-1")
-
-                    # Task content
-                    with ui.column().classes("flex-1 gap-1"):
-                        # Title with strikethrough if completed
-                        title_classes = "text-lg font-medium"
-                        if task.completed:
-                            title_classes += " line-through text-gray-500"
-                        else:
-                            title_classes += " text-gray-800"
-
-                        ui.label(task.title).classes(title_classes)
-
-                        # Description if present
-                        if task.description:
-                            desc_classes = "text-sm text-gray-600"
-                            if task.completed:
-                                desc_classes += " line-through"
-                            ui.label(task.description).classes(desc_classes)
-
-                        # Task metadata row
-                        with ui.row().classes("gap-4 mt-2"):
-                            # Priority badge
-                            priority_colors = {
-                                TaskPriority.LOW: "bg-green-100 text-green-800",
-                                TaskPriority.MEDIUM: "bg-blue-100 text-blue-800",
-                                TaskPriority.HIGH: "bg-orange-100 text-orange-800",
-                                TaskPriority.URGENT: "bg-red-100 text-red-800",
-                            }
-                            priority_icons = {
-                                TaskPriority.LOW: "🟢",
-                                TaskPriority.MEDIUM: "🟡",
-                                TaskPriority.HIGH: "🟠",
-                                TaskPriority.URGENT: "🔴",
-                            }
-
-                            ui.label(f"{priority_icons[task.priority]} {task.priority.value.title()}").classes(
-                                f"text-xs px-2 py-1 rounded-full {priority_colors[task.priority]}"
-                            )
-
-                            # Due date if present
-                            if task.due_date:
-                                due_classes = "text-xs px-2 py-1 rounded-full"
-                                if task.due_date < date.today() and not task.completed:
-                                    due_classes += " bg-red-100 text-red-800"
-                                else:
-                                    due_classes += " bg-gray-100 text-gray-700"
-                                ui.label(f"📅 Due: {task.due_date.strftime('%b %d')}").classes(due_classes)
-
-                # Right side: action buttons
-                with ui.row().classes("gap-1"):
-                    # Edit button
-                    ui.button(icon="edit", on_click=lambda _, task_id=task.id: edit_task_dialog(task_id)).classes(
-                        "text-blue-600 hover:bg-blue-50"
-                    ).props("flat round size=sm")
-
-                    # Delete button
-                    ui.button(icon="delete", on_click=lambda _, task_id=task.id: delete_task_confirm(task_id)).classes(
-                        "text-red-600 hover:bg-red-50"
-                    ).props("flat round size=sm")
-
-
-def toggle_task_completion(task_id: int):
-    """Toggle task completion status."""
-
-    task_service = None
-    try:
-        task_service = TaskService()
-        updated_task = task_service.toggle_completed(task_id)
 
-        if updated_task:
-            status = "completed" if updated_task.completed else "pending"
-            ui.notify(f"Task marked as {status}!", type="positive")
-            ui.navigate.reload()
+def create_task_card(task, on_change: Callable[[], None]):
+    """Create a task card UI component."""
+
+    with ui.card().classes(CARD_CLASSES[(task.priority, task.completed)]):
+        with ui.row().classes("w-full items-start justify-between"):
+            # Left side: checkbox and task info
+            with ui.row().classes("flex-1 items-start gap-3"):
+                # Completion checkbox; flips immediately in the browser and is saved once clicks settle
+                ui.checkbox(value=task.completed, on_change=debounced_toggle(task, on_change)).classes("mt-1")
+
+                # Task content
+                ui.html(render_task_content(task)).classes("flex-1 flex flex-col gap-1")
+
+            # Right side: action buttons
+            with ui.row().classes("gap-1"):
+                # Edit button
+                ui.button(
+                    icon="edit", on_click=lambda _, task_id=task.id: edit_task_dialog(task_id, on_change)
+                ).classes("text-blue-600 hover:bg-blue-50").props("flat round size=sm")
+
+                # Delete button
+                ui.button(
+                    icon="delete", on_click=lambda _, task_id=task.id: delete_task_confirm(task_id, on_change)
+                ).classes("text-red-600 hover:bg-red-50").props("flat round size=sm")
+
+
+def render_task_content(task: TaskRow) -> str:
+    """Render the title, description and badges of a task card as escaped HTML."""
+
+    # Description if present
+    description = ""
+    if task.description:
+        description = f'<div class="{DESCRIPTION_CLASSES[task.completed]}">{escape(task.description)}</div>'
+
+    # Due date if present, highlighted when overdue
+    due_date = ""
+    if task.due_date:
+        overdue = task.due_date < date.today() and not task.completed
+        due_date = f'<span class="{DUE_DATE_CLASSES[overdue]}">📅 Due: {task.due_date.strftime("%b %d")}</span>'
+
+    return TASK_CONTENT_TEMPLATE.format(
+        title_classes=TITLE_CLASSES[task.completed],
+        title=escape(task.title),
+        description=description,
+        badge_classes=PRIORITY_BADGE_CLASSES[task.priority],
+        badge_label=PRIORITY_BADGE_LABELS[task.priority],
+        due_date=due_date,
+    )
+
+
+def debounced_toggle(task: TaskRow, on_change: Callable[[], None]) -> Callable[[ValueChangeEventArguments], None]:
+    """Build a checkbox handler that saves the completion state after TOGGLE_DEBOUNCE seconds without clicks.
+
+    Pending states and the debounce timer are kept per page in ``app.storage.client`` rather than in the card:
+    the card belongs to the refreshable task list, and refreshing it would delete the timers of other cards.
+    """
+
+    def handle_change(e: ValueChangeEventArguments) -> None:
+        pending: dict[int, bool] = app.storage.client.setdefault("pending_toggles", {})
+        if e.value == task.completed:
+            # Clicked back to where it started
+            pending.pop(task.id, None)
         else:
-            ui.notify("Task not found", type="negative")
+            pending[task.id] = e.value
 
-    except Exception as e:
-        import logging
+        # Every click restarts the wait, so a burst of clicks results in at most one write per task
+        timer: Optional[ui.timer] = app.storage.client.pop("toggle_timer", None)
+        if timer is not None:
+            timer.cancel()
+        if pending:
+            with ui.context.client:
+                app.storage.client["toggle_timer"] = ui.timer(TOGGLE_DEBOUNCE, on_change, once=True)
+
+    return handle_change
 
-        logging.error(f"Error updating task {task_id}: {str(e)}")
-        ui.notify(f"Error updating task: {str(e)}", type="negative")
-    finally:
-        if task_service:
-            task_service.close()
 
+def save_pending_toggles() -> None:
+    """Save the completion states clicked since the last save; ``on_change`` calls it before every refresh."""
+
+    timer: Optional[ui.timer] = app.storage.client.pop("toggle_timer", None)
+    if timer is not None:
+        timer.cancel()
+    pending: dict[int, bool] = app.storage.client.pop("pending_toggles", {})
+
+    for task_id, completed in pending.items():
+        try:
+            # Save the checkbox value itself rather than flipping the stored one, which may have changed since render
+            with task_service() as service:
+                updated_task = service.update_task(task_id, TaskUpdate(completed=completed))
 
-async def delete_task_confirm(task_id: int):
+            if updated_task:
+                status = "completed" if updated_task.completed else "pending"
+                ui.notify(f"Task marked as {status}!", type="positive")
+            else:
+                ui.notify("Task not found", type="negative")
+
+        except Exception as e:
+            logger.exception("Error updating task %s", task_id)
+            ui.notify(f"Error updating task: {str(e)}", type="negative")
+
+
+async def delete_task_confirm(task_id: int, on_change: Callable[[], None]):
     """Show confirmation dialog before deleting task."""
 
     with ui.dialog() as dialog, ui.card():
@@ -339,34 +429,27 @@ async def delete_task_confirm(task_id: int):
     result = await dialog
 
     if result == "delete":
-        task_service = None
         try:
-            task_service = TaskService()
-            success = task_service.delete_task(task_id)
+            with task_service() as service:
+                success = service.delete_task(task_id)
 
             if success:
                 ui.notify("Task deleted successfully!", type="positive")
-                ui.navigate.reload()
+                on_change()
             else:
                 ui.notify("Task not found", type="negative")
 
         except Exception as e:
-            import logging
-
-            logging.error(f"Error deleting task {task_id}: {str(e)}")
+            logger.exception("Error deleting task %s", task_id)
             ui.notify(f"Error deleting task: {str(e)}", type="negative")
-        finally:
-            if task_service:
-                task_service.close()
 
 
-async def edit_task_dialog(task_id: int):
+async def edit_task_dialog(task_id: int, on_change: Callable[[], None]):
     """Show dialog to edit an existing task."""
 
-    task_service = None
     try:
-        task_service = TaskService()
-        task = task_service.get_task(task_id)
+        with task_service() as service:
+            task = service.get_task(task_id)
 
         if not task:
             ui.notify("Task not found", type="negative")
@@ -387,12 +470,7 @@ async def edit_task_dialog(task_id: int):
             priority_select = (
                 ui.select(
                     label="Priority",
-                    options={
-                        TaskPriority.LOW: "Low 🟢",
-                        TaskPriority.MEDIUM: "Medium 🟡",
-                        TaskPriority.HIGH: "High 🟠",
-                        TaskPriority.URGENT: "Urgent 🔴",
-                    },
+                    options=PRIORITY_OPTIONS,
                     value=task.priority,
                 )
                 .classes("w-full mb-3")
@@ -422,9 +500,7 @@ async def edit_task_dialog(task_id: int):
             due_date = None
             if due_date_input.value:
                 if isinstance(due_date_input.value, str):
-                    from datetime import datetime
-
-                    due_date = datetime.fromisoformat(due_date_input.value).date()
+                    due_date = date.fromisoformat(due_date_input.value[:10])
                 else:
                     due_date = due_date_input.value
 
@@ -436,19 +512,15 @@ async def edit_task_dialog(task_id: int):
                 due_date=due_date,
             )
 
-            updated_task = task_service.update_task(task_id, update_data)
+            with task_service() as service:
+                updated_task = service.update_task(task_id, update_data)
 
             if updated_task:
                 ui.notify("Task updated successfully!", type="positive")
-                ui.navigate.reload()
+                on_change()
             else:
                 ui.notify("Error updating task", type="negative")
 
     except Exception as e:
-        import logging
-
-        logging.error(f"Error editing task {task_id}: {str(e)}")
+        logger.exception("Error editing task %s", task_id)
         ui.notify(f"Error editing task: {str(e)}", type="negative")
-    finally:
-        if task_service:
-            task_service.close()
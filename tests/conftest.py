@@ -1,11 +1,51 @@
-from typing import Generator
-import pytest
-from app.startup import startup
-from nicegui.testing import User
+import os
+
+# Tests get a private in-memory SQLite database unless TEST_DATABASE_URL points somewhere else.
+# Each pytest-xdist worker is its own process, so `pytest -n auto --dist loadfile` gives every worker its own
+# database while keeping each file's tests on one worker; a shared TEST_DATABASE_URL server should be run
+# without -n, since each worker recreates the schema.
+os.environ["APP_DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL", "sqlite://")
+
+from typing import Generator  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy.engine import Connection, Engine  # noqa: E402
+from app.database import ENGINE, SESSION_BIND, get_session, reset_db  # noqa: E402
+from app.task_service import TaskService  # noqa: E402
+from app.startup import startup  # noqa: E402
+from nicegui.testing import User  # noqa: E402
 
 pytest_plugins = ["nicegui.testing.plugin"]
 
 
+@pytest.fixture(scope="session")
+def db_engine() -> Generator[Engine, None, None]:
+    """Engine with a freshly created schema, shared by the whole test session."""
+    reset_db()
+    yield ENGINE
+
+
+@pytest.fixture
+def new_db(db_engine: Engine) -> Generator[Connection, None, None]:
+    """Clean database for each test: everything it writes is rolled back afterwards."""
+    with db_engine.connect() as conn:
+        transaction = conn.begin()
+        token = SESSION_BIND.set(conn)
+        try:
+            yield conn
+        finally:
+            SESSION_BIND.reset(token)
+            transaction.rollback()
+
+
+@pytest.fixture
+def task_service(new_db: Connection) -> Generator[TaskService, None, None]:
+    """Task service with clean database."""
+    session = get_session()
+    service = TaskService(session)
+    yield service
+    service.close()
+
+
 @pytest.fixture
 def user(user: User) -> Generator[User, None, None]:
     startup()
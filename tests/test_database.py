@@ -0,0 +1,17 @@
+"""Tests for database engine setup."""
+
+from sqlmodel import text
+
+from app.database import create_db_engine
+
+
+def test_sqlite_engine_applies_pragmas(tmp_path):
+    """Test that SQLite connections are tuned for cheap commits."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'app.db'}")
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+
+    engine.dispose()
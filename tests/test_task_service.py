@@ -1,27 +1,42 @@
 """Tests for the task service layer."""
 
 import pytest
-from datetime import date, datetime
-from app.database import reset_db, get_session
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Iterator
+from sqlalchemy import event
+from sqlmodel import Session, col, select
+from app.database import ENGINE, get_session
 from app.task_service import TaskService
-from app.models import TaskCreate, TaskUpdate, TaskPriority
+from app.models import Task, TaskCreate, TaskUpdate, TaskPriority, utc_now
 
+# Dates are computed once, so every test in the module works from the same day
+TODAY = date.today()
+TOMORROW = TODAY + timedelta(days=1)
+YESTERDAY = TODAY - timedelta(days=1)
+NEXT_WEEK = TODAY + timedelta(days=7)
 
-@pytest.fixture()
-def new_db():
-    """Clean database for each test."""
-    reset_db()
-    yield
-    reset_db()
 
+@contextmanager
+def count_queries() -> Iterator[list[str]]:
+    """Collect the SQL statements sent to the database inside the block."""
+    statements: list[str] = []
 
-@pytest.fixture()
-def task_service(new_db):
-    """Task service with clean database."""
-    session = get_session()
-    service = TaskService(session)
-    yield service
-    service.close()
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # Skip the SAVEPOINTs that the per-test transaction wraps around each session transaction
+        if not statement.startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")):
+            statements.append(statement)
+
+    event.listen(ENGINE, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(ENGINE, "before_cursor_execute", record)
+
+
+def _assert_absent(session: Session, task_id: int) -> None:
+    """Assert that the database has no row for the task, reading only its id column."""
+    assert session.exec(select(Task.id).where(col(Task.id) == task_id)).first() is None
 
 
 class TestTaskCreation:
@@ -41,9 +56,14 @@ class TestTaskCreation:
         assert isinstance(task.created_at, datetime)
         assert isinstance(task.updated_at, datetime)
 
+    def test_create_task_timestamps_match(self, task_service: TaskService):
+        """Test that a new task gets one timestamp for both created_at and updated_at."""
+        task = task_service.create_task(TaskCreate(title="Timestamped"))
+        assert task.created_at == task.updated_at
+
     def test_create_task_with_all_fields(self, task_service: TaskService):
         """Test creating a task with all fields populated."""
-        due_date = date.today()
+        due_date = TODAY
         task_data = TaskCreate(
             title="Complete project",
             description="Finish the todo app implementation",
@@ -57,14 +77,27 @@ class TestTaskCreation:
         assert task.priority == TaskPriority.HIGH
         assert task.due_date == due_date
 
-    def test_create_task_with_different_priorities(self, task_service: TaskService):
+    @pytest.mark.parametrize("priority", list(TaskPriority))
+    def test_create_task_with_different_priorities(self, task_service: TaskService, priority: TaskPriority):
         """Test creating tasks with different priority levels."""
-        priorities = [TaskPriority.LOW, TaskPriority.MEDIUM, TaskPriority.HIGH, TaskPriority.URGENT]
+        task_data = TaskCreate(title=f"Task with {priority.value} priority", priority=priority)
+        task = task_service.create_task(task_data)
+        assert task.priority == priority
+
+    def test_bulk_create(self, task_service: TaskService):
+        """Test creating several tasks with a single commit and a shared timestamp."""
+        now = datetime(2024, 1, 2, 3, 4, 5)
+        with count_queries() as statements:
+            tasks = task_service.bulk_create(
+                [TaskCreate(title="First"), TaskCreate(title="Second", priority=TaskPriority.HIGH)], now=now
+            )
 
-        for priority in priorities:
-            task_data = TaskCreate(title=f"Task with {priority.value} priority", priority=priority)
-            task = task_service.create_task(task_data)
-            assert task.priority == priority
+        # Postgres sends both rows in one multi-row INSERT; SQLite inserts them one by one
+        assert statements and all(statement.startswith("INSERT INTO tasks") for statement in statements)
+        assert [task.title for task in tasks] == ["First", "Second"]
+        assert tasks[1].priority == TaskPriority.HIGH
+        assert all(task.id is not None for task in tasks)
+        assert all(task.created_at == task.updated_at == now for task in tasks)
 
 
 class TestTaskRetrieval:
@@ -78,11 +111,7 @@ class TestTaskRetrieval:
     def test_get_all_tasks_with_data(self, task_service: TaskService):
         """Test getting all tasks with data."""
         # Create test tasks
-        task1_data = TaskCreate(title="First task")
-        task2_data = TaskCreate(title="Second task")
-
-        task1 = task_service.create_task(task1_data)
-        task2 = task_service.create_task(task2_data)
+        task1, task2 = task_service.bulk_create([TaskCreate(title="First task"), TaskCreate(title="Second task")])
 
         tasks = task_service.get_all_tasks()
         assert len(tasks) == 2
@@ -90,6 +119,30 @@ class TestTaskRetrieval:
         assert tasks[0].id == task2.id
         assert tasks[1].id == task1.id
 
+    def test_get_all_tasks_pending_first(self, task_service: TaskService):
+        """Test that pending tasks are listed before completed ones."""
+        task1 = task_service.create_task(TaskCreate(title="Older pending task"))
+        task2 = task_service.create_task(TaskCreate(title="Pending task"))
+        task3 = task_service.create_task(TaskCreate(title="Completed task"))
+
+        assert task3.id is not None
+        task_service.toggle_completed(task3.id)
+
+        tasks = task_service.get_all_tasks()
+        assert [t.id for t in tasks] == [task2.id, task1.id, task3.id]
+
+    def test_get_many(self, task_service: TaskService):
+        """Test fetching several tasks by ID in one query, skipping unknown IDs."""
+        tasks = task_service.bulk_create([TaskCreate(title="First"), TaskCreate(title="Second")])
+        task_ids = [task.id for task in tasks if task.id is not None]
+
+        with count_queries() as statements:
+            fetched = task_service.get_many([task_ids[1], 999, task_ids[0]])
+
+        assert len(statements) == 1
+        assert [task.id for task in fetched] == sorted(task_ids)
+        assert task_service.get_many([]) == []
+
     def test_get_task_by_id_existing(self, task_service: TaskService):
         """Test getting an existing task by ID."""
         task_data = TaskCreate(title="Test task")
@@ -113,14 +166,30 @@ class TestTaskRetrieval:
         task2 = task_service.create_task(TaskCreate(title="Completed task"))
 
         # Mark second task as completed
-        if task2.id is not None:
-            task_service.toggle_completed(task2.id)
+        assert task2.id is not None
+        task_service.toggle_completed(task2.id)
 
-        completed_tasks = task_service.get_completed_tasks()
+        with count_queries() as statements:
+            completed_tasks = task_service.get_completed_tasks()
         assert len(completed_tasks) == 1
         assert completed_tasks[0].id == task2.id
         assert completed_tasks[0].completed
 
+        # The filter runs in the database rather than over every row in Python
+        assert len(statements) == 1
+        assert "WHERE tasks.completed IS" in statements[0]
+
+    def test_get_completed_tasks_breaks_ties_by_id(self, task_service: TaskService):
+        """Test that tasks completed at the same moment are listed newest ID first."""
+        tasks = task_service.bulk_create([TaskCreate(title="First"), TaskCreate(title="Second")])
+
+        now = utc_now()
+        for task in tasks:
+            assert task.id is not None
+            task_service.update_task(task.id, TaskUpdate(completed=True), now=now)
+
+        assert [task.id for task in task_service.get_completed_tasks()] == [tasks[1].id, tasks[0].id]
+
     def test_get_pending_tasks(self, task_service: TaskService):
         """Test getting only pending tasks."""
         # Create mix of completed and pending tasks
@@ -128,8 +197,8 @@ class TestTaskRetrieval:
         task2 = task_service.create_task(TaskCreate(title="Completed task"))
 
         # Mark second task as completed
-        if task2.id is not None:
-            task_service.toggle_completed(task2.id)
+        assert task2.id is not None
+        task_service.toggle_completed(task2.id)
 
         pending_tasks = task_service.get_pending_tasks()
         assert len(pending_tasks) == 1
@@ -137,6 +206,42 @@ class TestTaskRetrieval:
         assert not pending_tasks[0].completed
 
 
+class TestQueryCount:
+    """Test that listings load in a single query regardless of row count."""
+
+    @pytest.mark.parametrize("method", ["get_all_tasks", "get_pending_tasks", "get_completed_tasks"])
+    def test_listing_is_one_query(self, task_service: TaskService, method: str):
+        """Test that each listing issues exactly one statement."""
+        for i in range(3):
+            task = task_service.create_task(TaskCreate(title=f"Task {i}"))
+            assert task.id is not None
+            if i == 0:
+                task_service.toggle_completed(task.id)
+
+        with count_queries() as statements:
+            tasks = getattr(task_service, method)()
+            # Touch every column the UI renders; none of it may trigger further loads
+            for task in tasks:
+                _ = (task.title, task.description, task.priority, task.due_date, task.completed)
+
+        assert len(statements) == 1
+
+    def test_toggle_is_one_query(self, task_service: TaskService):
+        """Test that toggling updates and returns the task in a single statement."""
+        task = task_service.create_task(TaskCreate(title="Toggle me"))
+        assert task.id is not None
+
+        with count_queries() as statements:
+            toggled = task_service.toggle_completed(task.id)
+
+        assert len(statements) == 1
+        assert statements[0].lstrip().upper().startswith("UPDATE")
+        assert toggled is not None
+        assert toggled.completed
+        # The instance already held by the session is refreshed from RETURNING
+        assert task.completed
+
+
 class TestTaskUpdate:
     """Test task update functionality."""
 
@@ -145,17 +250,17 @@ class TestTaskUpdate:
         task = task_service.create_task(TaskCreate(title="Original title"))
         original_updated_at = task.updated_at
 
-        if task.id is not None:
-            updated_task = task_service.update_task(task.id, TaskUpdate(title="Updated title"))
+        assert task.id is not None
+        updated_task = task_service.update_task(task.id, TaskUpdate(title="Updated title"))
 
-            assert updated_task is not None
-            assert updated_task.title == "Updated title"
-            assert updated_task.updated_at > original_updated_at
+        assert updated_task is not None
+        assert updated_task.title == "Updated title"
+        assert updated_task.updated_at > original_updated_at
 
     def test_update_task_multiple_fields(self, task_service: TaskService):
         """Test updating multiple task fields."""
         task = task_service.create_task(TaskCreate(title="Original task"))
-        due_date = date.today()
+        due_date = TODAY
 
         assert task.id is not None
         update_data = TaskUpdate(
@@ -169,6 +274,21 @@ class TestTaskUpdate:
         assert updated_task.priority == TaskPriority.URGENT
         assert updated_task.due_date == due_date
 
+    def test_update_task_leaves_unset_fields(self, task_service: TaskService):
+        """Test that fields not passed to TaskUpdate keep their values."""
+        task = task_service.create_task(
+            TaskCreate(title="Original", description="Keep me", priority=TaskPriority.HIGH, due_date=TODAY)
+        )
+        assert task.id is not None
+
+        updated_task = task_service.update_task(task.id, TaskUpdate(description=""))
+
+        assert updated_task is not None
+        assert updated_task.title == "Original"
+        assert updated_task.description == ""
+        assert updated_task.priority == TaskPriority.HIGH
+        assert updated_task.due_date == TODAY
+
     def test_update_nonexistent_task(self, task_service: TaskService):
         """Test updating a non-existent task."""
         result = task_service.update_task(999, TaskUpdate(title="Won't work"))
@@ -190,6 +310,16 @@ class TestTaskUpdate:
         assert updated_task is not None
         assert not updated_task.completed
 
+    def test_toggle_completed_with_explicit_now(self, task_service: TaskService):
+        """Test that a caller-supplied timestamp is used for updated_at."""
+        task = task_service.create_task(TaskCreate(title="Test task"))
+        assert task.id is not None
+
+        now = datetime(2030, 1, 1, 12, 0)
+        updated_task = task_service.toggle_completed(task.id, now=now)
+        assert updated_task is not None
+        assert updated_task.updated_at == now
+
     def test_toggle_completed_nonexistent_task(self, task_service: TaskService):
         """Test toggling completion for non-existent task."""
         result = task_service.toggle_completed(999)
@@ -209,8 +339,7 @@ class TestTaskDeletion:
         assert result
 
         # Verify task is gone
-        deleted_task = task_service.get_task(task_id)
-        assert deleted_task is None
+        _assert_absent(task_service.session, task_id)
 
     def test_delete_nonexistent_task(self, task_service: TaskService):
         """Test deleting a non-existent task."""
@@ -218,6 +347,35 @@ class TestTaskDeletion:
         assert not result
 
 
+class TestDueDateSummary:
+    """Test due date summary aggregation."""
+
+    def test_summary_empty(self, task_service: TaskService):
+        """Test that every priority and bucket is present with zero counts."""
+        summary = task_service.get_due_date_summary()
+
+        assert set(summary) == set(TaskPriority)
+        for buckets in summary.values():
+            assert buckets == {"overdue": 0, "today": 0, "future": 0}
+
+    def test_summary_buckets_pending_tasks(self, task_service: TaskService):
+        """Test bucketing by priority and due date, ignoring completed and undated tasks."""
+        task_service.create_task(TaskCreate(title="Overdue", priority=TaskPriority.HIGH, due_date=YESTERDAY))
+        task_service.create_task(TaskCreate(title="Today", priority=TaskPriority.HIGH, due_date=TODAY))
+        task_service.create_task(TaskCreate(title="Future", priority=TaskPriority.LOW, due_date=TOMORROW))
+        task_service.create_task(TaskCreate(title="Future 2", priority=TaskPriority.LOW, due_date=NEXT_WEEK))
+        task_service.create_task(TaskCreate(title="No due date", priority=TaskPriority.HIGH))
+        done = task_service.create_task(TaskCreate(title="Done", priority=TaskPriority.HIGH, due_date=TODAY))
+        assert done.id is not None
+        task_service.toggle_completed(done.id)
+
+        summary = task_service.get_due_date_summary(TODAY)
+
+        assert summary[TaskPriority.HIGH] == {"overdue": 1, "today": 1, "future": 0}
+        assert summary[TaskPriority.LOW] == {"overdue": 0, "today": 0, "future": 2}
+        assert summary[TaskPriority.MEDIUM] == {"overdue": 0, "today": 0, "future": 0}
+
+
 class TestTaskValidation:
     """Test task validation and edge cases."""
 
@@ -250,6 +408,16 @@ class TestTaskServiceEdgeCases:
         assert task.id is not None
         service.close()
 
+    def test_task_readable_after_service_close(self, new_db):
+        """Test that returned tasks keep their loaded values once the session is closed."""
+        service = TaskService(get_session())
+        task = service.create_task(TaskCreate(title="Detached", priority=TaskPriority.LOW))
+        service.close()
+
+        assert task.id is not None
+        assert task.title == "Detached"
+        assert task.priority == TaskPriority.LOW
+
     def test_multiple_operations_same_service(self, task_service: TaskService):
         """Test multiple operations with same service instance."""
         # Create
@@ -270,5 +438,4 @@ class TestTaskServiceEdgeCases:
         assert result
 
         # Verify gone
-        final_task = task_service.get_task(task.id)
-        assert final_task is None
+        _assert_absent(task_service.session, task.id)
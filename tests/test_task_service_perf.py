@@ -0,0 +1,39 @@
+"""Benchmarks for the task service layer.
+
+Each benchmark uses pytest-benchmark's pedantic mode: input is prepared by ``setup`` outside the
+timed call, and every round runs the service call exactly once.
+"""
+
+from app.models import TaskCreate
+from app.task_service import TaskService
+
+ROUNDS = 50
+
+
+def test_create_task(benchmark, task_service: TaskService):
+    """Benchmark creating a task from fresh input each round."""
+
+    def setup():
+        return (TaskCreate(title="Benchmark task"),), {}
+
+    task = benchmark.pedantic(task_service.create_task, setup=setup, rounds=ROUNDS, iterations=1)
+    assert task.id is not None
+
+
+def test_toggle_completed(benchmark, task_service: TaskService):
+    """Benchmark toggling a task that is created outside the timed call."""
+
+    def setup():
+        task = task_service.create_task(TaskCreate(title="Benchmark task"))
+        return (task.id,), {}
+
+    task = benchmark.pedantic(task_service.toggle_completed, setup=setup, rounds=ROUNDS, iterations=1)
+    assert task is not None and task.completed
+
+
+def test_get_all_tasks(benchmark, task_service: TaskService):
+    """Benchmark listing a seeded task list."""
+    task_service.bulk_create([TaskCreate(title=f"Task {i}") for i in range(100)])
+
+    tasks = benchmark.pedantic(task_service.get_all_tasks, rounds=ROUNDS, iterations=1)
+    assert len(tasks) == 100
@@ -1,20 +1,67 @@
 """UI tests for the todo list application."""
 
+import asyncio
 import pytest
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from nicegui.testing import User
 from nicegui import ui
-from app.database import reset_db, get_session
+from nicegui.events import GenericEventArguments, handle_event
+from app.database import get_session
 from app.task_service import TaskService
-from app.models import TaskCreate, TaskPriority
-
-
-@pytest.fixture()
-def new_db():
-    """Clean database for each test."""
-    reset_db()
-    yield
-    reset_db()
+from app.models import TaskCreate, TaskPriority, TaskRow
+from app.todo_ui import TASK_BATCH_SIZE, TOGGLE_DEBOUNCE, render_task_content
+
+# Dates are computed once, so every test in the module works from the same day
+TODAY = date.today()
+TOMORROW = TODAY + timedelta(days=1)
+YESTERDAY = TODAY - timedelta(days=1)
+NEXT_WEEK = TODAY + timedelta(days=7)
+
+
+SNAPSHOT_TYPES = (ui.input, ui.select, ui.date, ui.textarea, ui.button, ui.checkbox)
+
+
+def _snapshot(user: User) -> dict[type, list]:
+    """Collect the page's visible widgets by type in a single walk of the element tree.
+
+    Matches ``user.find(cls).elements`` for each type, but yields an empty list instead of raising.
+    Take a new snapshot after anything that re-renders the page, such as opening it or refreshing the task list.
+    """
+    elements: dict[type, list] = {cls: [] for cls in SNAPSHOT_TYPES}
+    for element in user.current_layout.descendants():
+        if element.visible:
+            for cls in SNAPSHOT_TYPES:
+                if isinstance(element, cls):
+                    elements[cls].append(element)
+    return elements
+
+
+def _page_text(user: User) -> str:
+    """Collect the text of every visible label and HTML block on the current page in a single walk.
+
+    Use it for content that is already rendered, e.g. right after ``user.open``; keep ``user.should_see``
+    for content that appears asynchronously after an interaction.
+    """
+    texts = []
+    for element in user.current_layout.descendants():
+        if not element.visible:
+            continue
+        if isinstance(element, ui.label):
+            texts.append(element.text)
+        elif isinstance(element, ui.html):
+            texts.append(element.content)
+    return "\n".join(texts)
+
+
+def _scroll(user: User, position: float, percentage: float) -> None:
+    """Fire the task list's scroll event; ``user.find(...).trigger`` sends no event arguments."""
+    scroll_area = user.find(ui.scroll_area).elements.pop()
+    args = {"verticalPosition": position, "verticalPercentage": percentage}
+    with scroll_area.client:
+        for listener in scroll_area._event_listeners.values():
+            if listener.type == "scroll":
+                event = GenericEventArguments(sender=scroll_area, client=scroll_area.client, args=args)
+                handle_event(listener.handler, event)
 
 
 async def test_page_loads_correctly(user: User, new_db) -> None:
@@ -27,10 +74,11 @@ async def test_page_loads_correctly(user: User, new_db) -> None:
     await user.should_see("✨ Add New Task")
 
     # Check form elements exist
-    assert len(list(user.find(ui.input).elements)) >= 1  # Title input
-    assert len(list(user.find(ui.select).elements)) >= 1  # Priority select
-    assert len(list(user.find(ui.date).elements)) >= 1  # Due date
-    assert len(list(user.find(ui.textarea).elements)) >= 1  # Description
+    elements = _snapshot(user)
+    assert len(elements[ui.input]) >= 1  # Title input
+    assert len(elements[ui.select]) >= 1  # Priority select
+    assert len(elements[ui.date]) >= 1  # Due date
+    assert len(elements[ui.textarea]) >= 1  # Description
 
     # Should show empty state initially
     await user.should_see("No tasks yet!")
@@ -46,8 +94,9 @@ async def test_add_basic_task(user: User, new_db) -> None:
     # Submit the form
     user.find("Add Task").click()
 
-    # Should see success notification (this happens immediately)
-    # Note: Since we use ui.navigate.reload(), the task will appear after reload
+    # The task list is refreshed in place, so the new task shows up without a reload
+    await user.should_see("Buy groceries")
+    await user.should_see("📋 Pending Tasks (1)")
 
 
 async def test_add_task_with_all_fields(user: User, new_db) -> None:
@@ -56,20 +105,20 @@ async def test_add_task_with_all_fields(user: User, new_db) -> None:
 
     # Fill out all form fields
     user.find("Task Title").type("Complete project presentation")
+    elements = _snapshot(user)
 
     # Find and fill description textarea
-    textarea_elements = list(user.find(ui.textarea).elements)
+    textarea_elements = elements[ui.textarea]
     if textarea_elements:
         textarea_elements[0].set_value("Prepare slides, practice presentation, and gather feedback")
 
     # Set due date
-    date_elements = list(user.find(ui.date).elements)
+    date_elements = elements[ui.date]
     if date_elements:
-        tomorrow = date.today() + timedelta(days=1)
-        date_elements[0].set_value(tomorrow.isoformat())
+        date_elements[0].set_value(TOMORROW.isoformat())
 
     # Set priority to HIGH
-    select_elements = list(user.find(ui.select).elements)
+    select_elements = elements[ui.select]
     if select_elements:
         select_elements[0].set_value(TaskPriority.HIGH)
 
@@ -95,42 +144,41 @@ async def test_display_existing_tasks(user: User, new_db) -> None:
     # Create test tasks directly in database
     task_service = TaskService(get_session())
 
-    # Create a pending task
-    task_service.create_task(
-        TaskCreate(
-            title="Pending task",
-            description="This task is not completed",
-            priority=TaskPriority.HIGH,
-            due_date=date.today() + timedelta(days=3),
-        )
-    )
-
-    # Create a completed task
-    completed_task = task_service.create_task(
-        TaskCreate(title="Completed task", description="This task is done", priority=TaskPriority.MEDIUM)
+    # Create a pending task and one that gets completed
+    _, completed_task = task_service.bulk_create(
+        [
+            TaskCreate(
+                title="Pending task",
+                description="This task is not completed",
+                priority=TaskPriority.HIGH,
+                due_date=NEXT_WEEK,
+            ),
+            TaskCreate(title="Completed task", description="This task is done", priority=TaskPriority.MEDIUM),
+        ],
     )
-    if completed_task.id is not None:
-        task_service.toggle_completed(completed_task.id)
+    assert completed_task.id is not None
+    task_service.toggle_completed(completed_task.id)
 
     task_service.close()
 
-    # Load the page
+    # Load the page; the task list is rendered as part of it, so nothing needs to be waited for
     await user.open("/")
+    text = _page_text(user)
 
     # Should not see empty state
-    await user.should_not_see("No tasks yet!")
+    assert "No tasks yet!" not in text
 
     # Should see both tasks
-    await user.should_see("Pending task")
-    await user.should_see("Completed task")
+    assert "Pending task" in text
+    assert "Completed task" in text
 
     # Should see section headers
-    await user.should_see("📋 Pending Tasks (1)")
-    await user.should_see("✅ Completed Tasks (1)")
+    assert "📋 Pending Tasks (1)" in text
+    assert "✅ Completed Tasks (1)" in text
 
     # Should see priority and due date info
-    await user.should_see("High")
-    await user.should_see("Medium")
+    assert "High" in text
+    assert "Medium" in text
 
 
 async def test_task_interactions_exist(user: User, new_db) -> None:
@@ -148,22 +196,126 @@ async def test_task_interactions_exist(user: User, new_db) -> None:
     await user.should_see("Test interaction task")
 
     # Should have checkboxes and action buttons
-    checkboxes = list(user.find(ui.checkbox).elements)
+    checkboxes = _snapshot(user)[ui.checkbox]
     assert len(checkboxes) >= 1
 
+    # Toggling the checkbox moves the task to the completed section without a reload
+    checkboxes[0].set_value(True)
+    await user.should_see("✅ Completed Tasks (1)", retries=10)
+
     # Should have edit and delete buttons (found by icon)
     # Note: These are icon buttons, so we check for their presence indirectly
-    buttons = list(user.find(ui.button).elements)
+    # The toggle re-rendered the task list, so look the buttons up again
+    buttons = _snapshot(user)[ui.button]
     # We expect at least: Add Task button + edit button + delete button = 3 minimum
     assert len(buttons) >= 3
 
 
+async def test_long_task_list_mounts_first_batch(user: User, new_db) -> None:
+    """Test that long task lists only mount the first batch of cards up front."""
+
+    task_service = TaskService(get_session())
+    for i in range(TASK_BATCH_SIZE + 5):
+        task_service.create_task(TaskCreate(title=f"Task {i}"))
+    task_service.close()
+
+    await user.open("/")
+
+    # Section header counts every task, but only one batch of cards is mounted
+    await user.should_see(f"📋 Pending Tasks ({TASK_BATCH_SIZE + 5})")
+    assert len(list(user.find(ui.checkbox).elements)) == TASK_BATCH_SIZE
+
+
+async def test_long_task_list_keeps_scrolled_batches_after_refresh(user: User, new_db) -> None:
+    """Test that scrolling mounts the next batch and that ticking a task keeps it mounted."""
+
+    task_service = TaskService(get_session())
+    task_service.bulk_create([TaskCreate(title=f"Task {i}") for i in range(2 * TASK_BATCH_SIZE + 5)])
+    task_service.close()
+
+    await user.open("/")
+    _scroll(user, position=1500, percentage=0.85)
+    checkboxes = list(user.find(ui.checkbox).elements)
+    assert len(checkboxes) == 2 * TASK_BATCH_SIZE
+
+    # Tick a task from the second batch; the refreshed list still mounts both batches
+    checkboxes[TASK_BATCH_SIZE + 5].set_value(True)
+    await user.should_see(f"📋 Pending Tasks ({2 * TASK_BATCH_SIZE + 4})")
+    assert len(list(user.find(ui.checkbox).elements)) == 2 * TASK_BATCH_SIZE
+
+
+async def test_checkbox_click_burst_is_debounced(user: User, new_db) -> None:
+    """Test that clicking a checkbox on and off again quickly does not save anything."""
+
+    task_service = TaskService(get_session())
+    task = task_service.create_task(TaskCreate(title="Debounced task"))
+    task_service.close()
+
+    await user.open("/")
+    checkbox = user.find(ui.checkbox).elements.pop()
+    checkbox.set_value(True)
+    checkbox.set_value(False)
+
+    await asyncio.sleep(TOGGLE_DEBOUNCE * 3)
+    await user.should_see("📋 Pending Tasks (1)")
+
+    task_service = TaskService(get_session())
+    assert task.id is not None
+    stored = task_service.get_task(task.id)
+    task_service.close()
+    assert stored is not None
+    assert not stored.completed
+    assert stored.updated_at == task.updated_at
+
+
+async def test_quick_ticks_on_different_cards_are_all_saved(user: User, new_db) -> None:
+    """Test that ticking a second card before the first one is saved keeps both clicks."""
+
+    task_service = TaskService(get_session())
+    tasks = task_service.bulk_create([TaskCreate(title="Task A"), TaskCreate(title="Task B")])
+    task_service.close()
+
+    await user.open("/")
+    first, second = user.find(ui.checkbox).elements
+    first.set_value(True)
+    await asyncio.sleep(TOGGLE_DEBOUNCE * 0.6)
+    second.set_value(True)
+
+    await user.should_see("✅ Completed Tasks (2)")
+
+    task_service = TaskService(get_session())
+    stored = task_service.get_many([task.id for task in tasks if task.id is not None])
+    task_service.close()
+    assert [task.completed for task in stored] == [True, True]
+
+
+def test_task_content_is_escaped() -> None:
+    """Test that user-entered text is escaped in the rendered card content."""
+    now = datetime(2030, 1, 1)
+    task = TaskRow(
+        id=1,
+        title="<b>Bold</b> & co",
+        description="<script>alert(1)</script>",
+        completed=False,
+        priority=TaskPriority.HIGH,
+        due_date=None,
+        created_at=now,
+        updated_at=now,
+    )
+
+    content = render_task_content(task)
+
+    assert "&lt;b&gt;Bold&lt;/b&gt; &amp; co" in content
+    assert "&lt;script&gt;" in content
+    assert "<script>" not in content
+    assert "🟠 High" in content
+
+
 class TestTaskServiceIntegration:
     """Integration tests between UI and service layer."""
 
-    def test_service_create_and_display_flow(self, new_db):
+    def test_service_create_and_display_flow(self, task_service: TaskService):
         """Test that service layer properly integrates with UI expectations."""
-        task_service = TaskService(get_session())
 
         # Create task via service
         task = task_service.create_task(
@@ -171,7 +323,7 @@ class TestTaskServiceIntegration:
                 title="Integration test task",
                 description="Testing service integration",
                 priority=TaskPriority.URGENT,
-                due_date=date.today(),
+                due_date=TODAY,
             )
         )
 
@@ -181,46 +333,30 @@ class TestTaskServiceIntegration:
         assert task.priority == TaskPriority.URGENT
 
         # Verify it can be retrieved
-        if task.id is not None:
-            retrieved = task_service.get_task(task.id)
-            assert retrieved is not None
-            assert retrieved.title == task.title
-
-        task_service.close()
+        retrieved = task_service.get_task(task.id)
+        assert retrieved is not None
+        assert retrieved.title == task.title
 
-    def test_priority_enum_values_match_ui_expectations(self, new_db):
+    @pytest.mark.parametrize("priority", list(TaskPriority))
+    def test_priority_enum_values_match_ui_expectations(self, task_service: TaskService, priority: TaskPriority):
         """Test that priority enum values work correctly."""
+        task = task_service.create_task(TaskCreate(title=f"Task with {priority.value} priority", priority=priority))
+        assert task.priority == priority
+        assert task.priority.value in ["low", "medium", "high", "urgent"]
 
-        priorities = [TaskPriority.LOW, TaskPriority.MEDIUM, TaskPriority.HIGH, TaskPriority.URGENT]
-
-        task_service = TaskService(get_session())
-
-        for priority in priorities:
-            task = task_service.create_task(TaskCreate(title=f"Task with {priority.value} priority", priority=priority))
-            assert task.priority == priority
-            assert task.priority.value in ["low", "medium", "high", "urgent"]
-
-        task_service.close()
-
-    def test_date_handling_integration(self, new_db):
+    def test_date_handling_integration(self, task_service: TaskService):
         """Test that dates are handled correctly between service and UI."""
-        task_service = TaskService(get_session())
-
         # Test with various dates
-        test_dates = [date.today(), date.today() + timedelta(days=1), date.today() - timedelta(days=1), None]
-
-        for test_date in test_dates:
-            task = task_service.create_task(TaskCreate(title=f"Task for {test_date}", due_date=test_date))
-
-            assert task.due_date == test_date
+        test_dates = [TODAY, TOMORROW, YESTERDAY, None]
 
-            # Verify retrieval preserves date
-            if task.id is not None:
-                retrieved = task_service.get_task(task.id)
-                if retrieved is not None:
-                    assert retrieved.due_date == test_date
+        tasks = task_service.bulk_create([TaskCreate(title=f"Task for {d}", due_date=d) for d in test_dates])
+        assert [task.due_date for task in tasks] == test_dates
 
-        task_service.close()
+        # Verify retrieval preserves dates, reading them back from the database in one query
+        task_ids = [task.id for task in tasks if task.id is not None]
+        task_service.session.expunge_all()
+        retrieved = {task.id: task.due_date for task in task_service.get_many(task_ids)}
+        assert [retrieved[task_id] for task_id in task_ids] == test_dates
 
 
 async def test_ui_form_validation_scenarios(user: User, new_db) -> None:
@@ -231,19 +367,18 @@ async def test_ui_form_validation_scenarios(user: User, new_db) -> None:
     user.find("Add Task").click()
     # Form should not submit successfully (validation should catch this)
 
+    await user.should_see("No tasks yet!")
+
     # Test 2: Valid minimal task
     user.find("Task Title").type("Valid task")
     user.find("Add Task").click()
-    # This should work and show success
-
-    # Test 3: Clear form after submission attempt
-    await user.open("/")  # Reload to reset form
+    # This should work and show up in the refreshed task list
+    await user.should_see("📋 Pending Tasks (1)")
 
-    # Verify form is clean
-    title_inputs = list(user.find(ui.input).elements)
-    if title_inputs:
-        # The form should be empty initially
-        pass  # Hard to test input values directly in NiceGUI tests
+    # Test 3: The form is cleared after a successful submission, without reopening the page
+    title_input = user.find("Task Title").elements.pop()
+    assert isinstance(title_input, ui.input)
+    assert title_input.value == ""
 
 
 async def test_task_display_formatting(user: User, new_db) -> None:
@@ -252,36 +387,35 @@ async def test_task_display_formatting(user: User, new_db) -> None:
     # Create tasks with various properties for display testing
     task_service = TaskService(get_session())
 
-    # Task with long description
-    task_service.create_task(
-        TaskCreate(
-            title="Task with description",
-            description="This is a longer description that should display properly in the UI",
-            priority=TaskPriority.MEDIUM,
-        )
+    task_service.bulk_create(
+        [
+            # Task with long description
+            TaskCreate(
+                title="Task with description",
+                description="This is a longer description that should display properly in the UI",
+                priority=TaskPriority.MEDIUM,
+            ),
+            # Task with due date
+            TaskCreate(title="Task with due date", priority=TaskPriority.HIGH, due_date=NEXT_WEEK),
+            # Overdue task
+            TaskCreate(title="Overdue task", priority=TaskPriority.URGENT, due_date=YESTERDAY),
+        ],
     )
 
-    # Task with due date
-    future_date = date.today() + timedelta(days=7)
-    task_service.create_task(TaskCreate(title="Task with due date", priority=TaskPriority.HIGH, due_date=future_date))
-
-    # Overdue task
-    past_date = date.today() - timedelta(days=2)
-    task_service.create_task(TaskCreate(title="Overdue task", priority=TaskPriority.URGENT, due_date=past_date))
-
     task_service.close()
 
     await user.open("/")
+    text = _page_text(user)
 
     # Should see all tasks
-    await user.should_see("Task with description")
-    await user.should_see("Task with due date")
-    await user.should_see("Overdue task")
+    assert "Task with description" in text
+    assert "Task with due date" in text
+    assert "Overdue task" in text
 
     # Should see priority indicators
-    await user.should_see("Medium")
-    await user.should_see("High")
-    await user.should_see("Urgent")
+    assert "Medium" in text
+    assert "High" in text
+    assert "Urgent" in text
 
     # Should see description
-    await user.should_see("This is a longer description that should display properly in the UI")
+    assert "This is a longer description that should display properly in the UI" in text